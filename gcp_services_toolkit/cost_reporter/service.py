@@ -1,44 +1,31 @@
 import logging
 import datetime
-from collections import defaultdict, OrderedDict
-from typing import Dict, Any, List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from google.cloud import bigquery
 from google.api_core import exceptions as google_exceptions
 from gcp_utils.clients import get_bigquery_client
 
+class DayStat(NamedTuple):
+    query_count: int = 0
+    total_bytes_billed: int = 0
+
 def tool_name():
     return "BigQuery Count Reporter"
 
+_BYTE_UNIT_LABELS = ("Bytes", "KB", "MB", "GB", "TB")
+
 def _format_bytes(size_bytes: int) -> str:
     if not isinstance(size_bytes, (int, float)) or size_bytes < 0:
         return "N/A"
     if size_bytes == 0:
         return "0 Bytes"
-        
-    power = 1024
-    n = 0
-    power_labels = {0 : 'Bytes', 1: 'KB', 2: 'MB', 3: 'GB', 4: 'TB'}
-    while size_bytes >= power and n < len(power_labels) - 1:
-        size_bytes /= power
-        n += 1
-    return f"{size_bytes:.2f} {power_labels[n]}"
 
-def fetch_daily_query_stats_from_history(
-    project_id: str,
-    region: str,
-    num_days: int,
-    bq_client: bigquery.Client,
-    query_template: str,
-    info_schema_table_template: str 
-) -> OrderedDict[str, Dict[str, Any]]:
-    
-    daily_stats = defaultdict(lambda: {"query_count": 0, "total_bytes_billed": 0})
-    today_utc = datetime.datetime.now(datetime.timezone.utc).date()
-    
-    for i in range(num_days):
-        report_date = today_utc - datetime.timedelta(days=i)
-        daily_stats[report_date.isoformat()] 
+    # Each unit step is 2**10, so the bit length picks the unit without a division loop.
+    n = min(len(_BYTE_UNIT_LABELS) - 1, max(0, (int(size_bytes).bit_length() - 1) // 10))
+    return f"{size_bytes / (1 << (10 * n)):.2f} {_BYTE_UNIT_LABELS[n]}"
 
+def _prepare_query(project_id: str, region: str, query_template: str,
+                   info_schema_table_template: str) -> Tuple[str, str]:
     dataset_region_part = f"region-{region.lower().replace('_', '-')}"
     
     actual_info_schema_table_name = info_schema_table_template.format(
@@ -47,12 +34,35 @@ def fetch_daily_query_stats_from_history(
     )
 
     final_query = query_template.format(info_schema_table_name=actual_info_schema_table_name)
+    return actual_info_schema_table_name, final_query
+
+def fetch_daily_query_stats_from_history(
+    project_id: str,
+    region: str,
+    num_days: int,
+    bq_client: bigquery.Client,
+    query_template: str,
+    info_schema_table_template: str,
+    use_query_cache: bool = True
+) -> Tuple[Dict[datetime.date, DayStat], Optional[DayStat]]:
+
+    today_utc = datetime.datetime.now(datetime.timezone.utc).date()
+    # Seeded oldest-first; dict insertion order is the chronological display order.
+    daily_stats = {
+        today_utc - datetime.timedelta(days=num_days - 1 - i): DayStat()
+        for i in range(num_days)
+    }
+    period_totals = None
+
+    actual_info_schema_table_name, final_query = _prepare_query(
+        project_id, region, query_template, info_schema_table_template
+    )
     
     job_config = bigquery.QueryJobConfig(
         query_parameters=[
             bigquery.ScalarQueryParameter("num_report_days", "INT64", num_days),
         ],
-        use_query_cache=False
+        use_query_cache=use_query_cache
     )
     logging.info(f"{tool_name()}: Fetching query history from {actual_info_schema_table_name} for the last {num_days} days.")
     logging.debug(f"{tool_name()}: Executing query: {final_query.strip()}")
@@ -62,10 +72,12 @@ def fetch_daily_query_stats_from_history(
         results = query_job.result()
 
         for row in results:
-            job_date_str = row.job_date.isoformat()
-            if job_date_str in daily_stats:
-                daily_stats[job_date_str]["query_count"] = row.num_queries
-                daily_stats[job_date_str]["total_bytes_billed"] = row.total_bytes_billed_for_queries
+            if row.job_date is None:
+                # ROLLUP(job_date) grand-total row, aggregated server-side.
+                period_totals = DayStat(row.num_queries, row.total_bytes_billed_for_queries)
+                continue
+            if row.job_date in daily_stats:
+                daily_stats[row.job_date] = DayStat(row.num_queries, row.total_bytes_billed_for_queries)
         logging.info(f"{tool_name()}: Successfully fetched and processed query history.")
 
     except google_exceptions.NotFound as e:
@@ -78,13 +90,7 @@ def fetch_daily_query_stats_from_history(
     except Exception as e:
         logging.error(f"{tool_name()}: An unexpected error occurred while fetching query history: {e}", exc_info=True)
 
-    ordered_daily_stats = OrderedDict()
-    for i in range(num_days):
-        report_date = today_utc - datetime.timedelta(days=num_days - 1 - i) 
-        date_str = report_date.isoformat()
-        ordered_daily_stats[date_str] = daily_stats[date_str] 
-
-    return ordered_daily_stats
+    return daily_stats, period_totals
 
 def run_reporter(project_id: str, bq_config: dict, 
                  delete_flag: bool, dry_run_flag: bool):
@@ -95,6 +101,7 @@ def run_reporter(project_id: str, bq_config: dict,
     report_days_history = bq_config.get("report_days_history", 7)
     info_schema_query_template = bq_config.get("information_schema_query_template")
     info_schema_table_template_from_config = bq_config.get("information_schema_table_template")
+    use_query_cache = bq_config.get("use_query_cache", True)
 
     if not reporting_region:
         logging.error(f"{tool_name()}: 'reporting_region' not defined in BigQuery configuration. Aborting report.")
@@ -110,43 +117,48 @@ def run_reporter(project_id: str, bq_config: dict,
     
     logging.info(f"{tool_name()} - Last {report_days_history} Days from Job History for region {reporting_region}) ---")
     
-    daily_query_stats = fetch_daily_query_stats_from_history(
+    daily_query_stats, period_totals = fetch_daily_query_stats_from_history(
         project_id,
         reporting_region,
         report_days_history,
         bq_client,
         query_template=info_schema_query_template,
-        info_schema_table_template=info_schema_table_template_from_config
+        info_schema_table_template=info_schema_table_template_from_config,
+        use_query_cache=use_query_cache
     )
 
-    if not daily_query_stats or all(stats.get("query_count", 0) == 0 for stats in daily_query_stats.values()):
+    # Emptiness and the busiest day come from the per-day rows. The ROLLUP row only supplies
+    # the period totals, and its window may differ from the local day table.
+    day_queries_in_period = sum(stats.query_count for stats in daily_query_stats.values())
+    if period_totals is not None:
+        total_queries_in_period = period_totals.query_count
+        total_bytes_billed_in_period = period_totals.total_bytes_billed
+    else:
+        # Query template without ROLLUP: fall back to summing the day rows locally.
+        total_queries_in_period = day_queries_in_period
+        total_bytes_billed_in_period = sum(stats.total_bytes_billed for stats in daily_query_stats.values())
+
+    if day_queries_in_period == 0:
         logging.info(f"{tool_name()}: No query executions found in job history for project '{project_id}' in region '{reporting_region}' for the past {report_days_history}-day period.")
     else:
-        total_queries_in_period = 0
-        total_bytes_billed_in_period = 0
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            for report_date, stats in daily_query_stats.items():
+                bytes_str = _format_bytes(stats.total_bytes_billed)
+                logging.info(f"{tool_name()} for day {report_date.isoformat()}: {stats.query_count} queries, Bytes Billed: {bytes_str}")
+
         busiest_day_date_by_count = None
-        max_queries_on_busiest_day = -1
-        
-        display_ordered_stats = OrderedDict(sorted(daily_query_stats.items()))
-
-        for date_iso, stats in display_ordered_stats.items():
-            count = stats.get("query_count", 0)
-            bytes_billed = stats.get("total_bytes_billed", 0)
-            bytes_str = _format_bytes(bytes_billed)
-            logging.info(f"{tool_name()} for day {date_iso}: {count} queries, Bytes Billed: {bytes_str}")
-            total_queries_in_period += count
-            total_bytes_billed_in_period += bytes_billed
-            if count > max_queries_on_busiest_day:
-                max_queries_on_busiest_day = count
-                busiest_day_date_by_count = date_iso
-            elif count == max_queries_on_busiest_day and busiest_day_date_by_count and date_iso > busiest_day_date_by_count:
-                busiest_day_date_by_count = date_iso
+        max_queries_on_busiest_day = 0
+        if daily_query_stats:
+            # Ties on query count go to the most recent day.
+            busiest_day_date_by_count, busiest_day_stats = max(
+                daily_query_stats.items(), key=lambda item: (item[1].query_count, item[0])
+            )
+            max_queries_on_busiest_day = busiest_day_stats.query_count
 
         total_bytes_billed_str_period = _format_bytes(total_bytes_billed_in_period)
         logging.info(f"{tool_name()}: Total queries in the last {report_days_history} days: {total_queries_in_period}")
         logging.info(f"{tool_name()}: Total bytes billed in the last {report_days_history} days: {total_bytes_billed_str_period}")
-        
-        if busiest_day_date_by_count and max_queries_on_busiest_day >= 0:
-            logging.info(f"{tool_name()}: Busiest day by query count: {busiest_day_date_by_count} (with {max_queries_on_busiest_day} queries)")
+        if busiest_day_date_by_count is not None and max_queries_on_busiest_day > 0:
+            logging.info(f"{tool_name()}: Busiest day by query count: {busiest_day_date_by_count.isoformat()} (with {max_queries_on_busiest_day} queries)")
         else:
-            logging.info(f"{tool_name()}: No queries with count > 0 found in the period to determine busiest day.")
\ No newline at end of file
+            logging.info(f"{tool_name()}: No queries with count > 0 found in the period to determine busiest day.")
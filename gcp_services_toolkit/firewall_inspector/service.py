@@ -1,92 +1,230 @@
 import logging
-from typing import Sequence, Tuple, List, Dict
+import sys
+import functools
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Sequence, Tuple, List, Dict, Optional
 from google.cloud import compute_v1
 from google.api_core import exceptions as google_exceptions
+from google.api_core import retry as google_retry
 from google.cloud.compute_v1.types import Firewall
 from gcp_utils.clients import get_firewalls_client
 
+# Maximum page size accepted by firewalls.list; fewer pages means fewer round-trips.
+LIST_PAGE_SIZE = 500
 
-def check_ports_match(rule_ports: Sequence[str], config_ports: List[str]) -> bool:
-    if not rule_ports or "1-65535" in config_ports:
-        return True
+# Resolved once at import instead of walking Firewall.Direction.INGRESS per rule.
+_INGRESS_NAME = Firewall.Direction.INGRESS.name
 
-    def parse_port_range(port_str: str) -> range:
-        if '-' in port_str:
-            start, end = map(int, port_str.split('-'))
-            return range(start, end + 1)
-        return range(int(port_str), int(port_str) + 1)
+# Concurrent delete requests issued by delete_firewall_rules_batch.
+DELETE_MAX_WORKERS = 16
 
-    try:
-        rule_ranges = [parse_port_range(p) for p in rule_ports]
-        config_ranges = [parse_port_range(p) for p in config_ports]
-        for r_range in rule_ranges:
-            for c_range in config_ranges:
-                if any(port in c_range for port in r_range):
-                    return True
-        return False
-    except ValueError:
-        logging.warning(f"Invalid port format encountered. rule_ports={rule_ports}, config_ports={config_ports}. Treating as no match.")
-        return False
+# Backs off on throttling/transient server errors instead of abandoning the list or delete call.
+_TRANSIENT_RETRY = google_retry.Retry(
+    predicate=google_retry.if_exception_type(
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError,
+    ),
+    initial=1.0,
+    maximum=32.0,
+    multiplier=2.0,
+    timeout=120.0,
+)
+
+
+# Rule port tokens repeat heavily across a project ("22", "443", "80"...), so parse each once.
+@functools.lru_cache(maxsize=4096)
+def parse_port_range(port_str: str) -> Tuple[int, int]:
+    if '-' in port_str:
+        start, end = map(int, port_str.split('-'))
+        return start, end
+    port = int(port_str)
+    return port, port
+
+def build_port_index(config_ports: List[str]) -> Tuple[List[int], List[int]]:
+    # Merge overlapping/adjacent ranges into sorted disjoint intervals. Upper bounds are
+    # then sorted too, so one bisect on the lower bounds answers any overlap query.
+    merged_lows: List[int] = []
+    merged_highs: List[int] = []
+    for lo, hi in sorted(parse_port_range(p) for p in config_ports):
+        if merged_highs and lo <= merged_highs[-1] + 1:
+            merged_highs[-1] = max(merged_highs[-1], hi)
+        else:
+            merged_lows.append(lo)
+            merged_highs.append(hi)
+    return merged_lows, merged_highs
+
+def rule_ports_overlap(rule_ports: Sequence[str], port_index: Tuple[List[int], List[int]]) -> bool:
+    config_lows, config_highs = port_index
+    for p in rule_ports:
+        r_lo, r_hi = parse_port_range(p)
+        idx = bisect_right(config_lows, r_hi)
+        if idx and config_highs[idx - 1] >= r_lo:
+            return True
+    return False
+
+class _MatchedSources:
+    # Joins the alerted ranges a rule sources from only when a message is actually formatted.
+    __slots__ = ("_source_ip_alerts", "_rule_source_ranges")
+
+    def __init__(self, source_ip_alerts: frozenset, rule_source_ranges: Sequence[str]):
+        self._source_ip_alerts = source_ip_alerts
+        self._rule_source_ranges = rule_source_ranges
+
+    def __str__(self) -> str:
+        return "', '".join(sorted(self._source_ip_alerts.intersection(self._rule_source_ranges)))
 
-def list_firewall_rules(project_id: str) -> List[Firewall]:
+PermissiveChecker = Callable[[str, Sequence[str], _MatchedSources], Tuple[bool, str]]
+
+def _build_ports_matcher(config_ports: List[str],
+                         port_index: Optional[Tuple[List[int], List[int]]]) -> Callable[[Sequence[str]], bool]:
+    if not config_ports or "1-65535" in config_ports:
+        return lambda rule_ports: True
+    if port_index is None:
+        # Malformed config ports never overlap, but a rule with no ports still allows all of them.
+        return lambda rule_ports: not rule_ports
+    config_lows, config_highs = port_index
+    if config_lows[0] <= 1 and config_highs[0] >= 65535:
+        # Merged ranges span every port (e.g. "0-65535", or "1-1023" + "1024-65535").
+        return lambda rule_ports: True
+
+    def ports_match(rule_ports: Sequence[str]) -> bool:
+        if not rule_ports:
+            return True
+        try:
+            return rule_ports_overlap(rule_ports, port_index)
+        except ValueError:
+            logging.warning(f"Firewall Inspector: Invalid port format in rule ports {list(rule_ports)}. Treating as no match.")
+            return False
+    return ports_match
+
+def build_permissive_checker(by_proto: Dict[str, List[Tuple]], any_proto: List[Tuple]) -> PermissiveChecker:
+    # Specialises the criteria once per run: each protocol maps straight to a tuple of
+    # prebuilt port matchers, so checking a rule does no dict/str work on the config.
+    def compile_criteria(criteria: List[Tuple]) -> Tuple:
+        compiled = []
+        for criterion_dict, config_ports, port_index in criteria:
+            ports_match = _build_ports_matcher(config_ports, port_index)
+            compiled.append((ports_match, criterion_dict.get("protocol"), config_ports))
+        return tuple(compiled)
+
+    any_checks = compile_criteria(any_proto)
+    checks_by_proto = {proto: compile_criteria(criteria + any_proto) for proto, criteria in by_proto.items()}
+
+    def check(protocol: str, rule_ports: Sequence[str], matched_sources: _MatchedSources) -> Tuple[bool, str]:
+        for ports_match, criterion_protocol, config_ports in checks_by_proto.get(protocol, any_checks):
+            if not ports_match(rule_ports):
+                continue
+            if not config_ports:
+                return True, f"Allows {protocol.upper()} on ALL ports (as per empty 'ports' in config for protocol '{criterion_protocol}') from '{matched_sources}'."
+            return True, (f"Allows {protocol.upper()} on ports ({rule_ports if rule_ports else 'ALL'}) "
+                          f"from '{matched_sources}' which match configured permissive ports to flag"
+                          f"'{config_ports}' for criterion protocol '{criterion_protocol}'.")
+        return False, ""
+    return check
+
+def compile_source_ip_alerts(fw_config_params: Dict) -> frozenset:
+    # 'source_ip_alerts' (list) supersedes the legacy single 'source_ip_alert' key. A bare string
+    # is one range; frozenset() over it would silently yield a set of single characters.
+    source_ip_alerts = fw_config_params.get("source_ip_alerts") or [fw_config_params.get("source_ip_alert", "0.0.0.0/0")]
+    if isinstance(source_ip_alerts, str):
+        source_ip_alerts = [source_ip_alerts]
+    if not isinstance(source_ip_alerts, list) or not all(isinstance(r, str) for r in source_ip_alerts):
+        raise ValueError(f"Firewall Inspector: 'source_ip_alerts' must be a list of CIDR range strings, got {source_ip_alerts!r}.")
+    return frozenset(source_ip_alerts)
+
+def compile_fw_config(fw_config_params: Dict) -> Dict:
+    by_proto: Dict[str, List[Tuple[Dict, List[str], Optional[Tuple[List[int], List[int]]]]]] = {}
+    any_proto = []
+
+    for criterion_dict in fw_config_params.get("permissive_rules_details", []):
+        criterion_protocol = criterion_dict.get("protocol", "").lower()
+        config_ports = criterion_dict.get("ports", [])
+        try:
+            port_index = build_port_index(config_ports)
+        except ValueError:
+            logging.warning(f"Firewall Inspector: Invalid port format in permissive criterion {criterion_dict}. Only rules allowing all ports will match it.")
+            port_index = None
+
+        compiled_criterion = (criterion_dict, config_ports, port_index)
+        if criterion_protocol == "any":
+            any_proto.append(compiled_criterion)
+        else:
+            by_proto.setdefault(criterion_protocol, []).append(compiled_criterion)
+
+    return {
+        "source_ip_alerts": compile_source_ip_alerts(fw_config_params),
+        "flag_ingress_only": fw_config_params.get("flag_ingress_only", True),
+        "target_tags_to_ignore": frozenset(fw_config_params.get("target_tags_to_ignore", [])),
+        "target_sas_to_ignore": frozenset(fw_config_params.get("target_service_accounts_to_ignore", [])),
+        "permissive_checker": build_permissive_checker(by_proto, any_proto),
+    }
+
+def build_list_filter(compiled_fw_config: Dict) -> str:
+    # Compute list filters AND together expressions given in separate parentheses.
+    expressions = ["(disabled = false)"]
+    if compiled_fw_config["flag_ingress_only"]:
+        expressions.append(f'(direction = "{_INGRESS_NAME}")')
+    return " ".join(expressions)
+
+def iter_firewall_rules(project_id: str, page_size: int = LIST_PAGE_SIZE,
+                        filter_expr: Optional[str] = None) -> Iterator[Firewall]:
     client = get_firewalls_client()
-    firewalls_list: List[Firewall] = []
+    listed_count = 0
     try:
-        request = compute_v1.ListFirewallsRequest(project=project_id)
-        for firewall_item in client.list(request=request):
-            firewalls_list.append(firewall_item)
-        logging.info(f"Firewall Inspector: Listed {len(firewalls_list)} firewall rules for project '{project_id}'.")
+        request = compute_v1.ListFirewallsRequest(project=project_id, max_results=page_size, filter=filter_expr)
+        for firewall_item in client.list(request=request, retry=_TRANSIENT_RETRY):
+            listed_count += 1
+            yield firewall_item
+        logging.info(f"Firewall Inspector: Listed {listed_count} firewall rules for project '{project_id}'.")
     except google_exceptions.Forbidden:
         logging.error(f"Firewall Inspector: Permission denied to list firewall rules in project '{project_id}'. Requires 'compute.firewalls.list'.")
     except google_exceptions.NotFound:
         logging.error(f"Firewall Inspector: Project '{project_id}' not found or Compute Engine API not enabled.")
     except Exception as e:
         logging.error(f"Firewall Inspector: Failed to list firewall rules for project '{project_id}': {e}", exc_info=True)
-    return firewalls_list
 
-def is_rule_overly_permissive(rule: Firewall, fw_config_params: Dict) -> Tuple[bool, str]:
-    source_ip_alert = fw_config_params.get("source_ip_alert", "0.0.0.0/0")
-    flag_ingress_only = fw_config_params.get("flag_ingress_only", True)
-    permissive_criteria = fw_config_params.get("permissive_rules_details", [])
-    target_tags_to_ignore = set(fw_config_params.get("target_tags_to_ignore", []))
-    target_sas_to_ignore = set(fw_config_params.get("target_service_accounts_to_ignore", []))
+def list_firewall_rules(project_id: str, page_size: int = LIST_PAGE_SIZE,
+                        filter_expr: Optional[str] = None) -> List[Firewall]:
+    return list(iter_firewall_rules(project_id, page_size, filter_expr))
+
+def is_rule_overly_permissive(rule: Firewall, compiled_fw_config: Dict) -> Tuple[bool, str]:
+    source_ip_alerts = compiled_fw_config["source_ip_alerts"]
+    flag_ingress_only = compiled_fw_config["flag_ingress_only"]
+    target_tags_to_ignore = compiled_fw_config["target_tags_to_ignore"]
+    target_sas_to_ignore = compiled_fw_config["target_sas_to_ignore"]
+    permissive_checker = compiled_fw_config["permissive_checker"]
 
-    if flag_ingress_only and rule.direction != Firewall.Direction.INGRESS.name:
+    # Most selective predicate first: few rules source from an alerted range.
+    rule_source_ranges = rule.source_ranges
+    if source_ip_alerts.isdisjoint(rule_source_ranges):
         return False, ""
 
-    if source_ip_alert not in rule.source_ranges:
+    if flag_ingress_only and rule.direction != _INGRESS_NAME:
         return False, ""
 
-    if target_tags_to_ignore and set(rule.target_tags).intersection(target_tags_to_ignore):
-        logging.debug(f"Firewall Inspector: Rule '{rule.name}' (source: '{source_ip_alert}') skipped: matches ignored target_tags: {list(rule.target_tags)}")
+    matched_sources = _MatchedSources(source_ip_alerts, rule_source_ranges)
+
+    if not rule.allowed:
+        logging.debug("Firewall Inspector: Rule '%s' has source '%s' but no 'allowed' protocols/ports. Effectively blocks all.",
+                      rule.name, matched_sources)
         return False, ""
-    
-    if target_sas_to_ignore and set(rule.target_service_accounts).intersection(target_sas_to_ignore):
-        logging.debug(f"Firewall Inspector: Rule '{rule.name}' (source: '{source_ip_alert}') skipped: matches ignored target_service_accounts: {list(rule.target_service_accounts)}")
+
+    if target_tags_to_ignore and not target_tags_to_ignore.isdisjoint(rule.target_tags):
+        logging.debug("Firewall Inspector: Rule '%s' (source: '%s') skipped: matches ignored target_tags: %s",
+                      rule.name, matched_sources, list(rule.target_tags))
         return False, ""
 
-    if not rule.allowed:
-        logging.debug(f"Firewall Inspector: Rule '{rule.name}' has source '{source_ip_alert}' but no 'allowed' protocols/ports. Effectively blocks all.")
+    if target_sas_to_ignore and not target_sas_to_ignore.isdisjoint(rule.target_service_accounts):
+        logging.debug("Firewall Inspector: Rule '%s' (source: '%s') skipped: matches ignored target_service_accounts: %s",
+                      rule.name, matched_sources, list(rule.target_service_accounts))
         return False, ""
 
     for allowed_item in rule.allowed:
-        protocol = allowed_item.I_p_protocol.lower()
-        rule_ports = allowed_item.ports
-
-        matching_criteria_from_config = [
-            (criterion_dict, criterion_dict.get("ports", []))
-            for criterion_dict in permissive_criteria
-            if protocol == criterion_dict.get("protocol", "").lower() or \
-               criterion_dict.get("protocol", "").lower() == "any"
-        ]
-
-        for criterion_dict, config_ports_for_criterion in matching_criteria_from_config:
-            if not config_ports_for_criterion:
-                return True, f"Allows {protocol.upper()} on ALL ports (as per empty 'ports' in config for protocol '{criterion_dict.get('protocol')}') from '{source_ip_alert}'."
-            if check_ports_match(rule_ports, config_ports_for_criterion):
-                return True, (f"Allows {protocol.upper()} on ports ({rule_ports if rule_ports else 'ALL'}) "
-                              f"from '{source_ip_alert}' which match configured permissive ports to flag"
-                              f"'{config_ports_for_criterion}' for criterion protocol '{criterion_dict.get('protocol')}'.")
+        is_permissive, reason = permissive_checker(allowed_item.I_p_protocol.lower(), allowed_item.ports, matched_sources)
+        if is_permissive:
+            return True, reason
     return False, ""
 
 def delete_firewall_rule(project_id: str, rule_name: str, dry_run: bool = True) -> bool:
@@ -98,7 +236,7 @@ def delete_firewall_rule(project_id: str, rule_name: str, dry_run: bool = True)
 
     logging.info(f"Firewall Inspector: Attempting to delete rule '{rule_name}' in project '{project_id}'.")
     try:
-        operation = client.delete(project=project_id, firewall=rule_name)
+        operation = client.delete(project=project_id, firewall=rule_name, retry=_TRANSIENT_RETRY)
         logging.info(f"Firewall Inspector: Delete operation for rule '{rule_name}' in project '{project_id}' initiated. Operation ID: {operation.name}")
         return True
     except google_exceptions.NotFound:
@@ -111,68 +249,90 @@ def delete_firewall_rule(project_id: str, rule_name: str, dry_run: bool = True)
         logging.error(f"Firewall Inspector: Unexpected error deleting rule '{rule_name}' in project '{project_id}': {e}", exc_info=True)
         return False
 
+def delete_firewall_rules_batch(project_id: str, rule_names: Sequence[str], dry_run: bool = True,
+                                max_workers: int = DELETE_MAX_WORKERS) -> Dict[str, bool]:
+    unique_rule_names = list(dict.fromkeys(rule_names))
+    if dry_run or len(unique_rule_names) <= 1:
+        return {name: delete_firewall_rule(project_id, name, dry_run=dry_run) for name in unique_rule_names}
+
+    # Each delete is one network round-trip; overlap them instead of paying K x RTT.
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_rule_names))) as executor:
+        outcomes = executor.map(lambda name: delete_firewall_rule(project_id, name, dry_run=False), unique_rule_names)
+        return dict(zip(unique_rule_names, outcomes))
+
+def _read_confirmation(prompt: str) -> Optional[str]:
+    # Plain stdin read instead of input(), which loads the readline module on first use.
+    # Returns None at EOF or without a usable stdin, matching input()'s EOFError case.
+    try:
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+    except (AttributeError, OSError, ValueError):
+        return None
+    return line or None
+
 def run_firewall_inspector(project_id: str, fw_config_params: Dict,
                            attempt_deletion: bool, is_global_dry_run: bool):
     tool_name = "Firewall Inspector"
     logging.info(f"Starting {tool_name} for project '{project_id}'.")
-    logging.debug(f"{tool_name}: Received attempt_deletion={attempt_deletion}, is_global_dry_run={is_global_dry_run}")
+    logging.debug("%s: Received attempt_deletion=%s, is_global_dry_run=%s", tool_name, attempt_deletion, is_global_dry_run)
 
     effective_dry_run_for_delete_action = is_global_dry_run
     proceed_with_delete_actions = attempt_deletion
 
     if attempt_deletion and not is_global_dry_run:
         logging.warning(f"{tool_name}: --delete flag is active and global --dry-run is OFF. REAL deletions will be attempted IF USER CONFIRMS.")
-        try:
-            confirm = input(f"{tool_name}: Are you ABSOLUTELY SURE you want to proceed with REAL firewall deletions? (yes/no): ")
-            if confirm.lower() == 'yes':
-                logging.info(f"{tool_name}: User confirmed real deletions.")
-                effective_dry_run_for_delete_action = False
-            else:
-                logging.info(f"{tool_name}: User CANCELLED real deletions. No rules will be deleted by this tool.")
-                proceed_with_delete_actions = False
-        except EOFError:
+        confirm = _read_confirmation(f"{tool_name}: Are you ABSOLUTELY SURE you want to proceed with REAL firewall deletions? (yes/no): ")
+        if confirm is None:
             logging.error(f"{tool_name}: --delete flag used in a non-interactive environment without global --dry-run. REAL DELETIONS ABORTED.")
             proceed_with_delete_actions = False
+        elif confirm.strip().lower() == 'yes':
+            logging.info(f"{tool_name}: User confirmed real deletions.")
+            effective_dry_run_for_delete_action = False
+        else:
+            logging.info(f"{tool_name}: User CANCELLED real deletions. No rules will be deleted by this tool.")
+            proceed_with_delete_actions = False
     elif attempt_deletion and is_global_dry_run:
         logging.info(f"{tool_name}: --delete flag active, but global --dry-run is also active. Deletions will be SIMULATED.")
         effective_dry_run_for_delete_action = True
 
-    all_firewalls = list_firewall_rules(project_id)
+    compiled_fw_config = compile_fw_config(fw_config_params)
+    total_seen = 0
     flagged_rules_count = 0
+    flagged_rule_names: List[str] = []
     actions_taken_on_rules = 0
 
-    if all_firewalls is not None:
-        if len(all_firewalls) > 0 :
-             logging.info(f"{tool_name}: Analyzing {len(all_firewalls)} firewall rules...")
-        else:
-             logging.info(f"{tool_name}: No firewall rules found to analyze in project '{project_id}'.")
+    list_filter = build_list_filter(compiled_fw_config)
+    logging.info(f"{tool_name}: Analyzing firewall rules as they are listed...")
+    logging.debug("%s: Using server-side list filter: %s", tool_name, list_filter)
+    for rule in iter_firewall_rules(project_id, filter_expr=list_filter):
+        total_seen += 1
+        # Disabled rules are already filtered server-side; this is only a safety net.
+        # Source range and direction are checked first thing in is_rule_overly_permissive.
+        if rule.disabled:
+            continue
 
-        for rule in all_firewalls:
-            if rule.disabled:
-                logging.debug(f"{tool_name}: Rule '{rule.name}' is disabled, skipping.")
-                continue
-
-            is_permissive, reason = is_rule_overly_permissive(rule, fw_config_params)
-            
-            if is_permissive:
-                flagged_rules_count += 1
-                logging.warning(
-                    f"{tool_name} - FLAGGED: Rule '{rule.name}' (Priority: {rule.priority}, "
-                    f"Network: {rule.network.split('/')[-1]}). Reason: {reason}"
-                )
-
-                if proceed_with_delete_actions:
-                    delete_action_was_successful = delete_firewall_rule(
-                        project_id,
-                        rule.name,
-                        dry_run=effective_dry_run_for_delete_action
-                    )
-                    if delete_action_was_successful:
-                        actions_taken_on_rules += 1
+        is_permissive, reason = is_rule_overly_permissive(rule, compiled_fw_config)
         
-        logging.info(f"{tool_name}: Analysis complete. {flagged_rules_count} rule(s) flagged.")
-        if proceed_with_delete_actions:
-            action_verb = "simulated" if effective_dry_run_for_delete_action else "initiated"
-            logging.info(f"{tool_name}: {actions_taken_on_rules} flagged rule(s) had deletion {action_verb}.")
-    elif all_firewalls is None: 
-         logging.error(f"{tool_name}: Could not retrieve firewall rules from project '{project_id}'.")
+        if is_permissive:
+            flagged_rules_count += 1
+            logging.warning(
+                f"{tool_name} - FLAGGED: Rule '{rule.name}' (Priority: {rule.priority}, "
+                f"Network: {rule.network.rpartition('/')[2]}). Reason: {reason}"
+            )
+
+            flagged_rule_names.append(rule.name)
+
+    if total_seen == 0:
+        logging.info(f"{tool_name}: No firewall rules found to analyze in project '{project_id}'.")
+
+    logging.info(f"{tool_name}: Analysis complete. {total_seen} rule(s) analyzed, {flagged_rules_count} rule(s) flagged.")
+    if proceed_with_delete_actions:
+        delete_results = delete_firewall_rules_batch(
+            project_id,
+            flagged_rule_names,
+            dry_run=effective_dry_run_for_delete_action
+        )
+        actions_taken_on_rules = sum(1 for ok in delete_results.values() if ok)
+        action_verb = "simulated" if effective_dry_run_for_delete_action else "initiated"
+        logging.info(f"{tool_name}: {actions_taken_on_rules} flagged rule(s) had deletion {action_verb}.")
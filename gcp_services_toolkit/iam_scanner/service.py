@@ -1,85 +1,184 @@
 import logging
-from typing import List, Dict, Optional
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, List, Dict, FrozenSet, Iterator, Optional, Tuple
+from cachetools import TTLCache
 from google.cloud import storage
-from google.cloud.iam import Policy as GCP_IAM_Policy
+from google.api_core.iam import Policy as GCP_IAM_Policy
 from google.api_core import exceptions as google_exceptions
 from gcp_utils.clients import get_storage_client
 
+_TOOL_NAME = "IAM Policy Scanner"
+
 def tool_name():
-    return "IAM Policy Scanner"
+    return _TOOL_NAME
+
+BUCKET_LIST_PAGE_SIZE = 1000
+POLICY_FETCH_MAX_WORKERS = 32
+POLICY_CACHE_MAXSIZE = 2048
+POLICY_CACHE_TTL_SECONDS = 60
+_PUBLIC_MEMBERS = frozenset({"allUsers", "allAuthenticatedUsers"})
+_PAP_ENFORCED = "enforced"
+
+# Keyed by (project_id, bucket_name, metageneration) so a bucket update misses the cache.
+_POLICY_CACHE_LOCK = threading.Lock()
+_POLICY_CACHE: TTLCache = TTLCache(maxsize=POLICY_CACHE_MAXSIZE, ttl=POLICY_CACHE_TTL_SECONDS)
+
+def configure_policy_cache(ttl_seconds: float = POLICY_CACHE_TTL_SECONDS) -> None:
+    global _POLICY_CACHE
+    with _POLICY_CACHE_LOCK:
+        if _POLICY_CACHE.ttl != ttl_seconds:
+            _POLICY_CACHE = TTLCache(maxsize=POLICY_CACHE_MAXSIZE, ttl=ttl_seconds)
+
+def invalidate_policy_cache(bucket_name: Optional[str] = None) -> None:
+    with _POLICY_CACHE_LOCK:
+        if bucket_name is None:
+            _POLICY_CACHE.clear()
+            return
+        for key in [k for k in _POLICY_CACHE.keys() if k[1] == bucket_name]:
+            _POLICY_CACHE.pop(key, None)
+
+def _get_policy_cached(project_id: str, bucket: storage.Bucket) -> GCP_IAM_Policy:
+    cache_key = (project_id, bucket.name, bucket.metageneration)
+    with _POLICY_CACHE_LOCK:
+        policy = _POLICY_CACHE.get(cache_key)
+    if policy is not None:
+        return policy
+
+    # Errors propagate uncached so a transient failure is retried on the next scan.
+    policy = bucket.get_iam_policy(requested_policy_version=3)
+    with _POLICY_CACHE_LOCK:
+        _POLICY_CACHE[cache_key] = policy
+    return policy
+
+def _fetch_policy(project_id: str, bucket: storage.Bucket) -> Tuple[str, Optional[GCP_IAM_Policy], Optional[str]]:
+    try:
+        return bucket.name, _get_policy_cached(project_id, bucket), None
+    except (google_exceptions.Forbidden, google_exceptions.NotFound) as e:
+        logging.warning("%s - Access error for bucket '%s': %s", _TOOL_NAME, bucket.name, e)
+        return bucket.name, None, str(e)
+    except Exception as e:
+        logging.error("%s - Error retrieving policy for bucket '%s': %s", _TOOL_NAME, bucket.name, e)
+        return bucket.name, None, str(e)
+
+def _public_access_prevented(bucket: storage.Bucket) -> bool:
+    iam_configuration = getattr(bucket, "iam_configuration", None)
+    return getattr(iam_configuration, "public_access_prevention", None) == _PAP_ENFORCED
+
+def _collect_listed_entry(entry: Any, bucket_data_list: List[Dict]) -> int:
+    # Returns 1 when the entry was a pending policy fetch, 0 for a pre-built skipped entry.
+    if isinstance(entry, dict):
+        bucket_data_list.append(entry)
+        return 0
+    bucket_name, policy, error_message = entry.result()
+    bucket_data_list.append({
+        "bucket_name": bucket_name,
+        "policy": policy,
+        "error_getting_policy": error_message,
+        "skipped_reason": None
+    })
+    return 1
 
-def list_buckets_and_policies(project_id: str) -> List[Dict]:
-    storage_client = get_storage_client(project_id=project_id)
+def list_buckets_and_policies(project_id: str, max_workers: int = POLICY_FETCH_MAX_WORKERS,
+                              buckets_to_ignore: Optional[FrozenSet[str]] = None,
+                              members_to_flag: Optional[FrozenSet[str]] = None) -> List[Dict]:
+    workers = max(1, max_workers)
+    # The client's connection pool is sized to the fetch workers so no connection is discarded.
+    storage_client = get_storage_client(project_id=project_id, http_pool_size=workers)
     bucket_data_list: List[Dict] = []
     
+    listed_count = 0
+    ignored_count = 0
+    # With public access prevention enforced, public principals cannot hold effective
+    # grants, so when only public members are flagged those policies need not be fetched.
+    pap_can_short_circuit = members_to_flag is not None and members_to_flag <= _PUBLIC_MEMBERS
+
     try:
-        all_buckets_from_api = list(storage_client.list_buckets())
-        logging.info(f"{tool_name()}: Found {len(all_buckets_from_api)} buckets in project '{project_id}'.")
-
-        for bucket in all_buckets_from_api:
-            policy = None
-            error_message = None
-            try:
-                policy = bucket.get_iam_policy(requested_policy_version=3)
-            except (google_exceptions.Forbidden, google_exceptions.NotFound) as e:
-                error_message = str(e)
-                logging.warning(f"{tool_name()} - Access error for bucket '{bucket.name}': {error_message}")
-            except Exception as e:
-                error_message = str(e)
-                logging.error(f"{tool_name()} - Error retrieving policy for bucket '{bucket.name}': {e}")
-            
-            bucket_data_list.append({
-                "bucket_name": bucket.name,
-                "policy": policy,
-                "error_getting_policy": error_message
-            })
+        # Buckets are handed to the pool as list pages arrive, so listing overlaps policy
+        # fetches. Entries are drained oldest-first, so results keep listing order, and once
+        # 2 x workers fetches are pending listing waits on the oldest, so memory is O(workers).
+        pending: Deque[Any] = deque()
+        pending_fetches = 0
+        fetch_window = 2 * workers
+        fetch_count = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for bucket in storage_client.list_buckets(page_size=BUCKET_LIST_PAGE_SIZE):
+                listed_count += 1
+                # Ignored buckets are dropped before their get_iam_policy RPC is issued.
+                if buckets_to_ignore and bucket.name in buckets_to_ignore:
+                    ignored_count += 1
+                    continue
+                if pap_can_short_circuit and _public_access_prevented(bucket):
+                    pending.append({
+                        "bucket_name": bucket.name,
+                        "policy": None,
+                        "error_getting_policy": None,
+                        "skipped_reason": "public_access_prevention=enforced"
+                    })
+                    continue
+                pending.append(executor.submit(_fetch_policy, project_id, bucket))
+                pending_fetches += 1
+                fetch_count += 1
+                while pending_fetches >= fetch_window:
+                    pending_fetches -= _collect_listed_entry(pending.popleft(), bucket_data_list)
+
+            while pending:
+                _collect_listed_entry(pending.popleft(), bucket_data_list)
+        logging.info("%s: Listed %s buckets in project '%s' (%s ignored).", _TOOL_NAME, listed_count, project_id, ignored_count)
         
         successful_policies_count = sum(1 for b_data in bucket_data_list if b_data["policy"] is not None)
-        logging.debug(f"{tool_name()}: Attempted policy retrieval for {len(all_buckets_from_api)} buckets. Successful: {successful_policies_count}.")
+        logging.debug("%s: Attempted policy retrieval for %s buckets. Successful: %s.", _TOOL_NAME, fetch_count, successful_policies_count)
 
     except google_exceptions.Forbidden:
-        logging.error(f"{tool_name()}: Permission denied to list buckets in project '{project_id}'.")
+        logging.error("%s: Permission denied to list buckets in project '%s'.", _TOOL_NAME, project_id)
         return [] 
     except Exception as e:
-        logging.error(f"{tool_name()}: Error listing buckets in project '{project_id}': {e}", exc_info=True)
+        logging.error("%s: Error listing buckets in project '%s': %s", _TOOL_NAME, project_id, e, exc_info=True)
         return []
     return bucket_data_list
 
+def _iter_flagged_role_bindings(bucket_name: str, policy: GCP_IAM_Policy, roles_to_flag: FrozenSet[str]) -> Iterator[Tuple[str, Any, Dict]]:
+    for binding in policy.bindings:
+        # Most bindings carry roles that are not flagged; reject them before touching members.
+        role = binding.get('role')
+        if not role or role not in roles_to_flag:
+            continue
+
+        members_data = binding.get('members') or ()
+        if not isinstance(members_data, (list, set, tuple)):
+            logging.debug("%s: Unexpected type for 'members' in binding for bucket '%s': %s", _TOOL_NAME, bucket_name, type(members_data))
+            continue
+        yield role, members_data, binding
+
 def analyze_iam_policy(
     bucket_name: str, 
     policy: Optional[GCP_IAM_Policy], 
-    roles_to_flag: List[str], 
-    members_to_flag: List[str]
+    roles_to_flag: FrozenSet[str],
+    members_to_flag: FrozenSet[str]
 ) -> List[Dict]:
     
     flagged_findings: List[Dict] = []
     if not policy or not policy.bindings:
         return flagged_findings
 
-    for binding in policy.bindings:
-        role = binding.get('role')
-        members_data = binding.get('members', []) 
+    for role, members_data, binding in _iter_flagged_role_bindings(bucket_name, policy, roles_to_flag):
+        hits = members_to_flag.intersection(members_data)
+        if not hits:
+            continue
         condition = binding.get('condition')
-        
-        members = set()
-        if isinstance(members_data, (list, set, tuple)):
-            members = set(members_data)
-        elif members_data is not None:
-             logging.debug(f"{tool_name()}: Unexpected type for 'members' in binding for bucket '{bucket_name}': {type(members_data)}")
-
-        if role and role in roles_to_flag:
-            if members:
-                for member_item in members:
-                    if member_item in members_to_flag:
-                        finding = {
-                            "bucket_name": bucket_name, 
-                            "role": role, 
-                            "member": member_item, 
-                            "condition": condition
-                        }
-                        flagged_findings.append(finding)
-                        condition_str = f" (Condition: {str(condition)})" if condition else ""
-                        logging.warning(f"{tool_name()} - ATTENTION: Bucket '{bucket_name}' grants role '{role}' to member '{member_item}'.{condition_str}")
+        for member_item in hits:
+            finding = {
+                "bucket_name": bucket_name,
+                "role": role,
+                "member": member_item,
+                "condition": condition
+            }
+            flagged_findings.append(finding)
+            condition_str = f" (Condition: {str(condition)})" if condition else ""
+            logging.warning("%s - ATTENTION: Bucket '%s' grants role '%s' to member '%s'.%s",
+                            _TOOL_NAME, bucket_name, role, member_item, condition_str)
     return flagged_findings
 
 def suggest_remediation_plan(finding: Dict) -> str:
@@ -89,70 +188,94 @@ def suggest_remediation_plan(finding: Dict) -> str:
     condition = finding["condition"]
 
     remediation_text = (
-        f"{tool_name()} - REMEDIATION for Bucket '{bucket_name}': Remove role '{role}' for member '{member}'. Apply principle of least privilege.")
+        f"{_TOOL_NAME} - REMEDIATION for Bucket '{bucket_name}': Remove role '{role}' for member '{member}'. Apply principle of least privilege.")
     if condition:
         remediation_text += f" Note: Binding has a condition: {str(condition)}. Evaluate its impact."
     return remediation_text
 
+@functools.lru_cache(maxsize=32)
+def _describe_scan_targets(roles_to_flag: Tuple[str, ...], members_to_flag: Tuple[str, ...]) -> Tuple[str, str, str]:
+    roles_description = " or ".join(f"'{r}'" for r in roles_to_flag) if roles_to_flag else "any configured sensitive roles"
+    roles_prefix = "role" if len(roles_to_flag) == 1 else "roles"
+    members_description = " or ".join(f"'{m}'" for m in members_to_flag) if members_to_flag else "any configured sensitive members"
+    return roles_prefix, roles_description, members_description
+
 def run_iam_scanner(project_id: str, iam_config: Dict, 
                     delete_flag: bool, dry_run_flag: bool):
     
-    logging.info(f"{tool_name()}: Starting for project '{project_id}'.")
-    logging.debug(f"{tool_name()}: Received delete_flag={delete_flag} (not used), dry_run_flag={dry_run_flag} (not used).")
+    logging.info("%s: Starting for project '%s'.", _TOOL_NAME, project_id)
+    logging.debug("%s: Received delete_flag=%s (not used), dry_run_flag=%s (not used).", _TOOL_NAME, delete_flag, dry_run_flag)
     
     roles_to_flag = iam_config.get("roles_to_flag", ["roles/storage.admin"])
     members_to_flag = iam_config.get("members_to_flag", ["allUsers", "allAuthenticatedUsers"])
-    buckets_to_ignore = set(iam_config.get("buckets_to_ignore", []))
+    buckets_to_ignore = frozenset(iam_config.get("buckets_to_ignore", []))
     
-    roles_description = " or ".join(f"'{r}'" for r in roles_to_flag) if roles_to_flag else "any configured sensitive roles"
-    roles_prefix = "role" if len(roles_to_flag) == 1 else "roles"
-    members_description = " or ".join(f"'{m}'" for m in members_to_flag) if members_to_flag else "any configured sensitive members"
-    logging.info(f"{tool_name()}: Scanning for {roles_prefix} {roles_description} when granted to {members_description}.")
+    roles_prefix, roles_description, members_description = _describe_scan_targets(
+        tuple(roles_to_flag), tuple(members_to_flag)
+    )
+    logging.info("%s: Scanning for %s %s when granted to %s.", _TOOL_NAME, roles_prefix, roles_description, members_description)
+    # Built once per scan; analyze_iam_policy intersects binding members against them.
+    roles_to_flag_set = frozenset(roles_to_flag)
+    members_to_flag_set = frozenset(members_to_flag)
     
-    bucket_policy_data_list = list_buckets_and_policies(project_id)
+    max_parallel_policy_fetches = iam_config.get("max_parallel_policy_fetches", POLICY_FETCH_MAX_WORKERS)
+    configure_policy_cache(iam_config.get("policy_cache_ttl_seconds", POLICY_CACHE_TTL_SECONDS))
+
+    bucket_policy_data_list = list_buckets_and_policies(project_id, max_workers=max_parallel_policy_fetches,
+                                                        buckets_to_ignore=buckets_to_ignore,
+                                                        members_to_flag=members_to_flag_set)
     
     if not bucket_policy_data_list:
-        logging.info(f"{tool_name()}: No buckets found or policies could be retrieved. Scan finished.")
+        logging.info("%s: No buckets found, all were ignored, or policies could not be retrieved. Scan finished.", _TOOL_NAME)
         return
 
     total_flagged_findings = 0
     buckets_with_flags = 0
-    
-    eligible_buckets = [b for b in bucket_policy_data_list if b.get("bucket_name") not in buckets_to_ignore]
+    pap_short_circuited_count = 0
     
     processed_for_scan_count = 0
-    total_eligible_to_scan = len(eligible_buckets)
+    total_eligible_to_scan = len(bucket_policy_data_list)
+    # Remediation text is only built when the WARNING record would actually be emitted.
+    remediation_logging_enabled = logging.getLogger().isEnabledFor(logging.WARNING)
 
-    for bucket_data in eligible_buckets:
+    for bucket_data in bucket_policy_data_list:
         bucket_name = bucket_data.get("bucket_name")
         policy = bucket_data.get("policy")
         error_getting_policy = bucket_data.get("error_getting_policy")
 
         if not bucket_name:
-            logging.debug(f"{tool_name()}: Skipping bucket_data item with no name: {bucket_data}")
+            logging.debug("%s: Skipping bucket_data item with no name: %s", _TOOL_NAME, bucket_data)
+            continue
+
+        if bucket_data.get("skipped_reason"):
+            pap_short_circuited_count += 1
+            logging.debug("%s: Bucket '%s' not fetched: %s.", _TOOL_NAME, bucket_name, bucket_data['skipped_reason'])
             continue
             
         processed_for_scan_count += 1
-        logging.debug(f"{tool_name()}: Analyzing bucket: '{bucket_name}' ({processed_for_scan_count}/{total_eligible_to_scan})...")
+        logging.debug("%s: Analyzing bucket: '%s' (%s/%s)...", _TOOL_NAME, bucket_name, processed_for_scan_count, total_eligible_to_scan)
         
         if error_getting_policy:
-            logging.warning(f"{tool_name()}: Skipping analysis for bucket '{bucket_name}' due to previous error retrieving its policy: '{error_getting_policy}'.")
+            logging.warning("%s: Skipping analysis for bucket '%s' due to previous error retrieving its policy: '%s'.", _TOOL_NAME, bucket_name, error_getting_policy)
             continue
 
         findings = analyze_iam_policy(
             bucket_name,
             policy,
-            roles_to_flag,
-            members_to_flag
+            roles_to_flag_set,
+            members_to_flag_set
         )
         if findings:
             buckets_with_flags += 1
             total_flagged_findings += len(findings)
-            for finding in findings:
-                logging.warning(suggest_remediation_plan(finding))
+            if remediation_logging_enabled:
+                # One record per bucket keeps handler dispatch and I/O independent of the finding count.
+                logging.warning("%s - %d finding(s) for bucket '%s':\n%s", _TOOL_NAME, len(findings), bucket_name,
+                                "\n".join(suggest_remediation_plan(finding) for finding in findings))
             
-    logging.info(f"{tool_name()} - Total buckets processed: {len(bucket_policy_data_list)}")
-    logging.info(f"{tool_name()} - Buckets configured to be ignored: {len(buckets_to_ignore)}")
-    logging.info(f"{tool_name()} - Actual buckets analyzed for IAM policies: {processed_for_scan_count}")
-    logging.info(f"{tool_name()} - Buckets found with flagged policies: {buckets_with_flags}")
-    logging.info(f"{tool_name()} - Total individual flagged bindings found: {total_flagged_findings}")
\ No newline at end of file
+    logging.info("%s - Buckets with policy fetched: %s", _TOOL_NAME, len(bucket_policy_data_list) - pap_short_circuited_count)
+    logging.info("%s - Buckets short-circuited by PAP: %s", _TOOL_NAME, pap_short_circuited_count)
+    logging.info("%s - Buckets configured to be ignored: %s", _TOOL_NAME, len(buckets_to_ignore))
+    logging.info("%s - Actual buckets analyzed for IAM policies: %s", _TOOL_NAME, processed_for_scan_count)
+    logging.info("%s - Buckets found with flagged policies: %s", _TOOL_NAME, buckets_with_flags)
+    logging.info("%s - Total individual flagged bindings found: %s", _TOOL_NAME, total_flagged_findings)
\ No newline at end of file
@@ -1,22 +1,41 @@
 import logging
-from typing import Dict, Any
-from dataclasses import dataclass
+import types
+from typing import ClassVar, Dict, Any, List, Set, Tuple, Type
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from gcp_utils.utils import flush_logging
 from gcp_services_toolkit.firewall_inspector import service as fw_service
 from gcp_services_toolkit.iam_scanner import service as iam_service
 from gcp_services_toolkit.cost_reporter import service as bq_service
 
 
+_BANNER_RULE = "=" * 94
+
+# Shared read-only stand-in for a missing config section; services only read their section.
+_EMPTY_CONFIG = types.MappingProxyType({})
+
+
 @dataclass
 class ToolConfig:
     config_key: str
     tool_name: str
+    banner: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.banner = "\n".join((
+            _BANNER_RULE,
+            f"================================= EXECUTING: {self.tool_name} =====================================",
+            _BANNER_RULE,
+        ))
 
 
 class Tool(ABC):
-    @abstractmethod
+    # Built once per tool class, so the banner is formatted a single time per process.
+    tool_config: ClassVar[ToolConfig]
+
     def get_tool_config(self) -> ToolConfig:
-        pass    
+        return self.tool_config
      
     @abstractmethod
     def run(self, 
@@ -28,21 +47,17 @@ class Tool(ABC):
 
 
 class FirewallInspectorTool(Tool):
-    def get_tool_config(self) -> ToolConfig:
-        return ToolConfig(
-            config_key="firewall_inspector",
-            tool_name="Firewall Rule Inspector & Cleaner"
-        )
+    tool_config = ToolConfig(
+        config_key="firewall_inspector",
+        tool_name="Firewall Rule Inspector & Cleaner"
+    )
 
     def run(self, project_id: str, global_config: Dict[str, Any],
             global_dry_run_flag: bool, global_delete_flag: bool) -> None:
         tool_config = self.get_tool_config()
-        logging.debug(f"Initializing {tool_config.tool_name} with global_dry_run={global_dry_run_flag}, global_delete={global_delete_flag}")
+        logging.debug("Initializing %s with global_dry_run=%s, global_delete=%s", tool_config.tool_name, global_dry_run_flag, global_delete_flag)
         
-        case_specific_config = global_config.get(tool_config.config_key, {})
-        if not case_specific_config:
-             logging.warning(f"{tool_config.tool_name}: No specific configuration section '{tool_config.config_key}' found in config.json. "
-                             "Tool may use defaults or its logic might be limited.")
+        case_specific_config = global_config.get(tool_config.config_key) or _EMPTY_CONFIG
         
         fw_service.run_firewall_inspector(
             project_id=project_id,
@@ -53,21 +68,17 @@ class FirewallInspectorTool(Tool):
 
 
 class IAMScannerTool(Tool):
-    def get_tool_config(self) -> ToolConfig:
-        return ToolConfig(
-            config_key="iam_scanner",
-            tool_name="IAM Policy Scanner"
-        )
+    tool_config = ToolConfig(
+        config_key="iam_scanner",
+        tool_name="IAM Policy Scanner"
+    )
 
     def run(self, project_id: str, global_config: Dict[str, Any],
             global_dry_run_flag: bool, global_delete_flag: bool) -> None:
         tool_config = self.get_tool_config()
-        logging.debug(f"Initializing {tool_config.tool_name} with global_dry_run={global_dry_run_flag} (not directly used), global_delete={global_delete_flag} (not used).")
+        logging.debug("Initializing %s with global_dry_run=%s (not directly used), global_delete=%s (not used).", tool_config.tool_name, global_dry_run_flag, global_delete_flag)
         
-        case_specific_config = global_config.get(tool_config.config_key, {})
-        if not case_specific_config:
-             logging.warning(f"{tool_config.tool_name}: No specific configuration section '{tool_config.config_key}' found in config.json. "
-                             "Tool may use default flagging criteria or its logic might be limited.")
+        case_specific_config = global_config.get(tool_config.config_key) or _EMPTY_CONFIG
 
         iam_service.run_iam_scanner(project_id, case_specific_config,
                                     delete_flag=global_delete_flag,
@@ -75,16 +86,15 @@ class IAMScannerTool(Tool):
 
 
 class QueryCountReporterTool(Tool):
-    def get_tool_config(self) -> ToolConfig:
-        return ToolConfig(
-            config_key="bigquery_cost_reporter",
-            tool_name="BigQuery Cost Reporter"
-        )
+    tool_config = ToolConfig(
+        config_key="bigquery_cost_reporter",
+        tool_name="BigQuery Cost Reporter"
+    )
 
     def run(self, project_id: str, global_config: Dict[str, Any],
             global_dry_run_flag: bool, global_delete_flag: bool) -> None:
         tool_config = self.get_tool_config()
-        logging.debug(f"Initializing {tool_config.tool_name} with global_dry_run={global_dry_run_flag} (not used), global_delete={global_delete_flag} (not used).")
+        logging.debug("Initializing %s with global_dry_run=%s (not used), global_delete=%s (not used).", tool_config.tool_name, global_dry_run_flag, global_delete_flag)
 
         case_specific_config = global_config.get(tool_config.config_key) 
                                                                         
@@ -93,23 +103,73 @@ class QueryCountReporterTool(Tool):
                                     delete_flag=global_delete_flag,
                                     dry_run_flag=global_dry_run_flag)
         else:
-            logging.warning(f"{tool_config.tool_name}: Configuration section '{tool_config.config_key}' "
-                            "not found in config.json. Skipping this tool.")
+            logging.info("%s: Configuration section '%s' "
+                         "not found in config.json. Skipping this tool.", tool_config.tool_name, tool_config.config_key)
 
 
 class ToolManager:
     def __init__(self):
-        self.tools: Dict[str, Tool] = {}
-
-    def register_tool(self, identifier: str, tool_instance: Tool) -> None:
+        # Registration order is execution order; the id set only backs the duplicate check.
+        # Tools are registered as classes and only instantiated when they are run.
+        self.tools: List[Tuple[str, Type[Tool]]] = []
+        self._tool_ids: Set[str] = set()
 
-        if identifier in self.tools:
-
-            logging.warning(f"Tool with identifier '{identifier}' is already registered. Overwriting previous instance.")
-        self.tools[identifier] = tool_instance
-        logging.debug(f"Tool '{tool_instance.get_tool_config().tool_name}' registered with identifier '{identifier}'.")
+    def register_tool(self, identifier: str, tool_class: Type[Tool]) -> None:
 
+        if identifier in self._tool_ids:
 
+            logging.warning("Tool with identifier '%s' is already registered. Overwriting previous registration.", identifier)
+            self.tools = [(tool_id, tool_class if tool_id == identifier else registered_class)
+                          for tool_id, registered_class in self.tools]
+        else:
+            self._tool_ids.add(identifier)
+            self.tools.append((identifier, tool_class))
+        logging.debug("Tool '%s' registered with identifier '%s'.", tool_class.__name__, identifier)
+
+
+
+    def _run_tool(self, tool_class: Type[Tool], project_id: str, global_config: Dict[str, Any],
+                  global_dry_run_flag: bool, global_delete_flag: bool, concurrent: bool = False) -> bool:
+        try:
+            tool_instance = tool_class()
+            tool_config = tool_instance.get_tool_config()
+        except Exception as e_init:
+            logging.error("CRITICAL ERROR initializing tool %s: %s", tool_class.__name__, e_init, exc_info=True)
+            return False
+        tool_name = tool_config.tool_name
+
+        # Concurrent tools interleave their output, so a banner would not delimit anything;
+        # they get one-line start/finish markers that name the tool instead.
+        if concurrent:
+            logging.info("========== %s STARTED ==========", tool_name)
+        else:
+            logging.info("\n%s", tool_config.banner)
+        try:
+            tool_instance.run(
+                project_id,
+                global_config,
+                global_dry_run_flag=global_dry_run_flag,
+                global_delete_flag=global_delete_flag
+            )
+            return True
+        except Exception as e_tool:
+            logging.error("CRITICAL ERROR during execution of %s: %s", tool_name, e_tool, exc_info=True)
+            return False
+        finally:
+            logging.info("========== %s FINISHED ==========", tool_name)
+            flush_logging()
+
+    def _warn_missing_config_sections(self, global_config: Dict[str, Any]) -> None:
+        # One sweep over the registered tools so missing sections are reported together.
+        missing_sections = []
+        # config_key is read from the class; tools are only instantiated by _run_tool.
+        for _, tool_class in self.tools:
+            config_key = tool_class.tool_config.config_key
+            if not global_config.get(config_key):
+                missing_sections.append(config_key)
+        if missing_sections:
+            logging.warning("Configuration sections not found in config.json: %s. "
+                            "The affected tools will use their defaults or be skipped.", ", ".join(missing_sections))
 
     def run_all_registered_tools(self, project_id: str, global_config: Dict[str, Any],
                                  global_dry_run_flag: bool, global_delete_flag: bool) -> None:
@@ -117,25 +177,19 @@ class ToolManager:
             logging.warning("No tools are registered in ToolManager. Nothing to execute.")
             return
 
+        self._warn_missing_config_sections(global_config)
         logging.info("Attempting to execute all registered tools...")
-        executed_tool_count = 0
-        for tool_identifier, tool_instance in self.tools.items():
-            tool_name = tool_instance.get_tool_config().tool_name
-            
-            logging.info(f"==============================================================================================")
-            logging.info(f"================================= EXECUTING: {tool_name} =====================================")
-            logging.info(f"==============================================================================================")
-            try:
-                tool_instance.run(
-                    project_id,
-                    global_config,
-                    global_dry_run_flag=global_dry_run_flag,
-                    global_delete_flag=global_delete_flag
-                )
-                executed_tool_count += 1
-            except Exception as e_tool:
-                logging.error(f"CRITICAL ERROR during execution of {tool_name}: {e_tool}", exc_info=True)
-            logging.info(f"========== {tool_name} FINISHED ==========")
+        run_args = (project_id, global_config, global_dry_run_flag, global_delete_flag)
+        # Tools hit disjoint APIs, so they can overlap. A real-deletion run stays sequential
+        # because the Firewall Inspector prompts on stdin for confirmation.
+        interactive_deletion = global_delete_flag and not global_dry_run_flag
+        if interactive_deletion or len(self.tools) == 1:
+            outcomes = [self._run_tool(tool_class, *run_args) for _, tool_class in self.tools]
+        else:
+            with ThreadPoolExecutor(max_workers=len(self.tools)) as executor:
+                futures = [executor.submit(self._run_tool, tool_class, *run_args, concurrent=True) for _, tool_class in self.tools]
+                outcomes = [future.result() for future in as_completed(futures)]
+        executed_tool_count = sum(outcomes)
         
         if executed_tool_count == 0 and self.tools:
             logging.info("All registered tools were processed, but none may have performed actions or some were skipped due to configuration.")
@@ -1,44 +1,80 @@
 import logging
+import functools
+import threading
 from typing import Optional
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
 from google.cloud import compute_v1
 from google.cloud import storage
 from google.cloud import bigquery
 
-_CLIENTS_CACHE = {}
+# Default connection pool size for storage clients; callers pass their worker count instead.
+# The default urllib3 pool keeps 10 connections, so extra worker threads would discard
+# keep-alive connections after every request.
+STORAGE_HTTP_POOL_SIZE = 32
 
+# Clients are memoized: each owns its credentials, HTTP session and connection pool,
+# which are expensive to rebuild. Failed constructions raise and are not cached.
+# Each getter has its own lock, taken only on a cache miss (double-checked), so cache hits
+# are lock-free and different client types can be built concurrently without duplicates.
+
+
+def _construct_once(getter):
+    clients = {}
+    lock = threading.Lock()
+
+    @functools.wraps(getter)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        client = clients.get(key)
+        if client is None:
+            with lock:
+                client = clients.get(key)
+                if client is None:
+                    client = clients[key] = getter(*args, **kwargs)
+        return client
+    wrapper.cache_clear = clients.clear
+    return wrapper
+
+
+@_construct_once
 def get_firewalls_client() -> compute_v1.FirewallsClient:
-    client_key = "firewalls_client"
-    if client_key not in _CLIENTS_CACHE:
-        try:
-            _CLIENTS_CACHE[client_key] = compute_v1.FirewallsClient()
-            logging.debug("Compute Engine FirewallsClient initialized and cached.")
-        except Exception as e:
-            logging.error(f"Failed to initialize Compute Engine FirewallsClient: {e}", exc_info=True)
-            raise
-    return _CLIENTS_CACHE[client_key]
-
-
-def get_storage_client(project_id: Optional[str] = None) -> storage.Client:
-    client_key = "storage_client"
-
-    if client_key not in _CLIENTS_CACHE:
-        try:
-            _CLIENTS_CACHE[client_key] = storage.Client(project=project_id)
-            logging.debug(f"Cloud Storage client initialized for project '{project_id or "default/inferred"}' and cached.")
-        except Exception as e:
-            logging.error(f"Failed to initialize Cloud Storage client: {e}", exc_info=True)
-            raise
-    return _CLIENTS_CACHE[client_key]
-
-
-def get_bigquery_client(project_id: Optional[str] = None) -> bigquery.Client:  
-    client_key = "bigquery_client"
-        
-    if client_key not in _CLIENTS_CACHE:
-        try:
-            _CLIENTS_CACHE[client_key] = bigquery.Client(project=project_id)
-            logging.debug(f"BigQuery client initialized for project '{project_id or "default/inferred"}' and cached.")
-        except Exception as e:
-            logging.error(f"Failed to initialize BigQuery client: {e}", exc_info=True)
-            raise
-    return _CLIENTS_CACHE[client_key]
\ No newline at end of file
+    try:
+        client = compute_v1.FirewallsClient()
+        logging.debug("Compute Engine FirewallsClient initialized and cached.")
+        return client
+    except Exception as e:
+        logging.error("Failed to initialize Compute Engine FirewallsClient: %s", e, exc_info=True)
+        raise
+
+
+# Keyed on (project_id, http_pool_size), so each project gets its own client.
+# storage.Client has no pool-size option, so the session is built here and handed in through
+# its _http argument, with the same mTLS channel setup the client would do for its own session.
+@_construct_once
+def get_storage_client(project_id: Optional[str] = None,
+                       http_pool_size: int = STORAGE_HTTP_POOL_SIZE) -> storage.Client:
+    try:
+        credentials, _ = google.auth.default(scopes=storage.Client.SCOPE)
+        http = AuthorizedSession(credentials)
+        http.configure_mtls_channel()
+        if not http.is_mtls:
+            http.mount("https://", HTTPAdapter(pool_connections=http_pool_size, pool_maxsize=http_pool_size))
+        client = storage.Client(project=project_id, credentials=credentials, _http=http)
+        logging.debug("Cloud Storage client initialized for project '%s' and cached.", project_id or 'default/inferred')
+        return client
+    except Exception as e:
+        logging.error("Failed to initialize Cloud Storage client: %s", e, exc_info=True)
+        raise
+
+
+@_construct_once
+def get_bigquery_client(project_id: Optional[str] = None) -> bigquery.Client:
+    try:
+        client = bigquery.Client(project=project_id)
+        logging.debug("BigQuery client initialized for project '%s' and cached.", project_id or 'default/inferred')
+        return client
+    except Exception as e:
+        logging.error("Failed to initialize BigQuery client: %s", e, exc_info=True)
+        raise
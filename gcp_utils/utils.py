@@ -1,31 +1,55 @@
 import logging
+import logging.handlers
 import json
 import sys
 
+# orjson is an optional faster parser; its JSONDecodeError subclasses json.JSONDecodeError.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 DEFAULT_LOG_LEVEL = logging.INFO
 
+LOG_BUFFER_CAPACITY = 64
+
 def setup_logging(level=DEFAULT_LOG_LEVEL):
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%d-%m-%Y %H:%M:%S',
-        handlers=[logging.StreamHandler(sys.stdout)]
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(
+        fmt='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%d-%m-%Y %H:%M:%S'
+    ))
+    # Records are written in small batches instead of one write() per line. Any WARNING or
+    # above flushes immediately (so it is seen before e.g. the deletion prompt), the tool
+    # runner calls flush_logging() when each tool finishes, and logging.shutdown() flushes
+    # the remainder at exit. The capacity stays small: a SIGTERM skips logging.shutdown().
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.WARNING,
+        target=stream_handler
     )
-    logging.debug(f"Logging setup complete. Level set to: {logging.getLevelName(level)}")
+    logging.basicConfig(level=level, handlers=[buffered_handler])
+    logging.debug("Logging setup complete. Level set to: %s", logging.getLevelName(level))
+
+
+def flush_logging():
+    for handler in logging.getLogger().handlers:
+        handler.flush()
 
 
 def load_config(config_path: str) -> dict:
     try:
-        with open(config_path, 'r') as f:
-            config_data = json.load(f)
-        logging.info(f"Configuration successfully loaded from '{config_path}'.")
+        with open(config_path, 'rb') as f:
+            config_data = _json_loads(f.read())
+        logging.info("Configuration successfully loaded from '%s'.", config_path)
         return config_data
     except FileNotFoundError:
-        logging.critical(f"CRITICAL ERROR: Configuration file not found at '{config_path}'. Please ensure it exists.")
+        logging.critical("CRITICAL ERROR: Configuration file not found at '%s'. Please ensure it exists.", config_path)
         sys.exit(1)
     except json.JSONDecodeError as e:
-        logging.critical(f"CRITICAL ERROR: Could not decode JSON from '{config_path}'. Error: {e}. Please check the file format.")
+        logging.critical("CRITICAL ERROR: Could not decode JSON from '%s'. Error: %s. Please check the file format.", config_path, e)
         sys.exit(1)
     except Exception as e:
-        logging.critical(f"CRITICAL ERROR: An unexpected error occurred while loading configuration from '{config_path}': {e}", exc_info=True)
+        logging.critical("CRITICAL ERROR: An unexpected error occurred while loading configuration from '%s': %s", config_path, e, exc_info=True)
         sys.exit(1)
\ No newline at end of file
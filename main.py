@@ -3,13 +3,11 @@ import logging
 import sys
 import json 
 from gcp_utils import utils as common_utils
-from gcp_services_toolkit.toolkit import ToolManager, FirewallInspectorTool, IAMScannerTool, QueryCountReporterTool
+
+log = logging.getLogger("gcp_toolkit")
 
 def main():
-    parser = argparse.ArgumentParser(
-        description="GCP Services Toolkit",
-        formatter_class=argparse.RawTextHelpFormatter
-    )
+    parser = argparse.ArgumentParser(description="GCP Services Toolkit")
 
     parser.add_argument(
         "--config",
@@ -30,32 +28,35 @@ def main():
     )
 
     args = parser.parse_args()
+    # Imported after parsing so --help and usage errors do not load the google-cloud SDKs.
+    # This still runs on the main thread, before ToolManager starts any worker threads.
+    from gcp_services_toolkit.toolkit import ToolManager, FirewallInspectorTool, IAMScannerTool, QueryCountReporterTool
     common_utils.setup_logging() 
     
     try:
         config = common_utils.load_config(args.config)
     except FileNotFoundError:
-        logging.critical(f"CRITICAL: Configuration file not found at {args.config}. Exiting.")
+        log.critical("CRITICAL: Configuration file not found at %s. Exiting.", args.config)
         sys.exit(1)
     except json.JSONDecodeError:
-        logging.critical(f"CRITICAL: Could not decode JSON from {args.config}. Please check its format. Exiting.")
+        log.critical("CRITICAL: Could not decode JSON from %s. Please check its format. Exiting.", args.config)
         sys.exit(1)
 
     project_id = config.get("project_id")
     if not project_id:
-        logging.critical("CRITICAL: 'project_id' not found in the configuration file. Exiting.")
+        log.critical("CRITICAL: 'project_id' not found in the configuration file. Exiting.")
         sys.exit(1)
 
-    logging.info(f"========= GCP Services Toolkit starting for Project ID: {project_id} =========")
     if args.dry_run:
-        logging.info("Global DRY-RUN mode is ACTIVE. Destructive operations will be simulated by applicable tools.")
+        dry_run_status = "Global DRY-RUN mode is ACTIVE. Destructive operations will be simulated by applicable tools."
     else:
-        logging.info("Global DRY-RUN mode is NOT ACTIVE. Destructive operations may occur if confirmed.")
+        dry_run_status = "Global DRY-RUN mode is NOT ACTIVE. Destructive operations may occur if confirmed."
+    log.info("========= GCP Services Toolkit starting for Project ID: %s =========\n%s", project_id, dry_run_status)
 
     tool_manager = ToolManager()    
-    tool_manager.register_tool("firewall-inspector", FirewallInspectorTool())
-    tool_manager.register_tool("iam-scanner", IAMScannerTool())
-    tool_manager.register_tool("query-reporter", QueryCountReporterTool())
+    tool_manager.register_tool("firewall-inspector", FirewallInspectorTool)
+    tool_manager.register_tool("iam-scanner", IAMScannerTool)
+    tool_manager.register_tool("query-reporter", QueryCountReporterTool)
     
     tool_manager.run_all_registered_tools(
         project_id, 
@@ -63,7 +64,7 @@ def main():
         global_dry_run_flag=args.dry_run, 
         global_delete_flag=args.delete\
     )
-    logging.info("===== GCP Services Toolkit finished all tasks. =====")
+    log.info("===== GCP Services Toolkit finished all tasks. =====")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file